@@ -1,6 +1,8 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
-from wordcloud import WordCloud
+from wordcloud import STOPWORDS, WordCloud
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -12,229 +14,376 @@ st.sidebar.title("Social Media Sentiments Analysis")
 
 @st.cache_data
 def load_data():
-    df = pd.read_csv("sentimentdataset.csv", encoding="utf-8")  # Changed to relative path
-    df["Platform"] = df["Platform"].str.title()
-    return df
+    df = pd.read_csv(
+        "sentimentdataset.csv",  # Changed to relative path
+        encoding="utf-8",
+        usecols=["Text", "Sentiment", "User", "Platform", "Likes", "Country", "Year", "Month", "Day"],
+        # Narrow numeric types; Likes is stored as "30.0" in the CSV so it is cast after parsing
+        dtype={"Year": "int16[pyarrow]", "Month": "int8[pyarrow]", "Day": "int8[pyarrow]"},
+        dtype_backend="pyarrow"
+    )
+    df["Likes"] = df["Likes"].astype("int32[pyarrow]")
+    df["Platform"] = df["Platform"].str.strip().str.title()
+    df["Country"] = df["Country"].str.strip()
+    df["Sentiment"] = df["Sentiment"].str.strip()
+    # Low-cardinality columns as categoricals so groupbys hash small integer codes
+    for col in ("Platform", "Country", "Sentiment", "Month"):
+        df[col] = df[col].astype("category")
+    # Sorted (Year, Month, Day) index so the date filter is a lookup, not three column scans
+    df_by_date = df.set_index(["Year", "Month", "Day"]).sort_index()
+    return df, df_by_date
+
+# Preprocess text data for word cloud in Arrow kernels: the lowercased
+# whitespace-separated words longer than 3 characters
+def preprocess_text(texts):
+    lower = pc.utf8_lower(pa.array(texts.astype("string[pyarrow]")))
+    tokens = pc.list_flatten(pc.utf8_split_whitespace(lower))
+    return pc.filter(tokens, pc.greater_equal(pc.utf8_length(tokens), 4))
+
+# Count words the way WordCloud.generate() tokenizes them, keeping only the
+# `limit` most frequent since the cloud prunes to max_words anyway. This
+# replaces WordCloud's own stopword, number and possessive-'s handling
+def word_frequencies(texts, limit):
+    words = pc.list_flatten(pc.split_pattern_regex(preprocess_text(texts), r"[^\pL\pN_']+"))
+    words = pc.replace_substring_regex(pc.utf8_ltrim(words, characters="'"), r"'s$", "")
+    words = pc.filter(words, pc.and_(
+        pc.greater(pc.utf8_length(words), 0),
+        pc.invert(pc.or_(pc.is_in(words, value_set=pa.array(sorted(STOPWORDS))), pc.utf8_is_digit(words)))
+    ))
+    counts = pc.value_counts(words)
+    top = pc.array_sort_indices(counts.field("counts"), order="descending")[:limit]
+    return dict(zip(
+        pc.take(counts.field("values"), top).to_pylist(),
+        pc.take(counts.field("counts"), top).to_pylist()
+    ))
+
+@st.cache_data
+def build_wordcloud(df):
+    max_words = 300
+
+    # Count words across all text
+    frequencies = word_frequencies(df['Text'], limit=max_words * 3)
+
+    # Generate word cloud
+    wordcloud = WordCloud(
+        width=1200, 
+        height=600,
+        background_color='white',
+        colormap='plasma',
+        max_words=max_words,
+        contour_width=0,
+        contour_color='white'
+    ).generate_from_frequencies(frequencies)
+    return wordcloud.to_array()
+
+@st.cache_data
+def compute_aggregates(df):
+    # None of these depend on widget values, so compute them once per dataset
+    sentiment_counts = (
+        df["Sentiment"].value_counts().nlargest(10)
+        .rename_axis("Sentiment").reset_index(name="Count")
+    )
+    top_10_sentiments = sentiment_counts["Sentiment"].tolist()
+    sentiment_filtered_df = df[df["Sentiment"].isin(top_10_sentiments)]
+
+    country_sentiment = df.groupby(['Country', 'Sentiment'], observed=True).size().unstack(fill_value=0)
+    # Reduce over the sentiment columns only, before the summary columns are added
+    sentiment_counts_arr = country_sentiment.to_numpy()
+    sentiment_labels = country_sentiment.columns.to_numpy()
+    country_sentiment['Total_Posts'] = sentiment_counts_arr.sum(axis=1)
+    country_sentiment['Dominant_Sentiment'] = sentiment_labels[sentiment_counts_arr.argmax(axis=1)]
+    country_sentiment = country_sentiment.reset_index()
+
+    # Long-form country/sentiment counts, melted once and filtered per tab
+    sentiment_columns = tuple(
+        c for c in country_sentiment.columns if c not in ("Country", "Total_Posts", "Dominant_Sentiment")
+    )
+    country_sentiment_long = country_sentiment.melt(
+        id_vars=['Country'],
+        value_vars=list(sentiment_columns),
+        var_name='Sentiment',
+        value_name='Count'
+    )
+
+    most_liked_by_platform = (
+        df.sort_values("Likes", ascending=False, kind="stable")
+        .drop_duplicates("Platform", keep="first")
+    )
+
+    return {
+        "platforms": sorted(df["Platform"].cat.categories.tolist()),
+        "countries": sorted(df["Country"].dropna().unique().tolist()),
+        "top_by_platform": most_liked_by_platform.set_index("Platform")[["Likes", "Text", "User"]].to_dict(orient="index"),
+        "top_10_sentiments": top_10_sentiments,
+        "sentiment_counts": sentiment_counts,
+        # Reindexed to first-appearance order, matching the original row-level bar chart
+        "platform_counts": (
+            df["Platform"].value_counts().reindex(df["Platform"].unique())
+            .rename_axis("Platform").reset_index(name="Count")
+        ),
+        "platform_likes": df.groupby("Platform", as_index=False, observed=True)["Likes"].mean(),
+        "sentiment_likes": sentiment_filtered_df.groupby("Sentiment", as_index=False, observed=True)["Likes"].mean(),
+        "sentiment_platform_counts": df.groupby(["Platform", "Sentiment"], observed=True).size().unstack(fill_value=0),
+        "country_sentiment": country_sentiment,
+        "country_sentiment_long": country_sentiment_long,
+        "sentiment_columns": sentiment_columns,
+    }
+
+# Figures only depend on the cached aggregates, so build each one once and
+# hand the same object back on every rerun
+@st.cache_resource
+def build_sentiment_bar(counts, order):
+    fig = go.Figure(go.Bar(
+        x=counts["Sentiment"].to_numpy(),
+        y=counts["Count"].to_numpy(),
+        marker_color=px.colors.sequential.Viridis[0]
+    ))
+    fig.update_layout(
+        title="Sentiment Distribution (Top 10)",
+        xaxis=dict(title="Sentiment", categoryorder="array", categoryarray=order),
+        yaxis_title="Count"
+    )
+    return fig
+
+@st.cache_resource
+def build_platform_bar(counts):
+    fig = go.Figure(go.Bar(
+        x=counts["Platform"].to_numpy(),
+        y=counts["Count"].to_numpy(),
+        marker_color=px.colors.qualitative.Pastel[0]
+    ))
+    fig.update_layout(title="Posts by Platform", xaxis_title="Platform", yaxis_title="Count")
+    return fig
+
+@st.cache_resource
+def build_platform_likes_bar(platform_likes):
+    fig = go.Figure(go.Bar(
+        x=platform_likes["Platform"].to_numpy(),
+        y=platform_likes["Likes"].to_numpy(),
+        marker_color=px.colors.qualitative.Set3[0]
+    ))
+    fig.update_layout(title="Average Likes per Platform", xaxis_title="Platform", yaxis_title="Average Likes")
+    return fig
+
+@st.cache_resource
+def build_sentiment_likes_bar(sentiment_likes, order):
+    fig = go.Figure(go.Bar(
+        x=sentiment_likes["Sentiment"].to_numpy(),
+        y=sentiment_likes["Likes"].to_numpy(),
+        marker_color=px.colors.sequential.Plasma[0]
+    ))
+    fig.update_layout(
+        title="Average Likes per Sentiment (Top 10)",
+        xaxis=dict(title="Sentiment", categoryorder="array", categoryarray=order),
+        yaxis_title="Average Likes"
+    )
+    return fig
+
+@st.cache_resource
+def build_country_map(country_sentiment, sentiment_columns):
+    # Create interactive choropleth map
+    # Stays on the geo renderer: map-tile choropleths need a country GeoJSON, and
+    # country_sentiment is already one row per country
+    fig = px.choropleth(
+        country_sentiment,
+        locations="Country",
+        locationmode='country names',
+        color="Total_Posts",
+        hover_name="Country",
+        hover_data={
+            'Total_Posts': True,
+            'Dominant_Sentiment': True,
+            **dict.fromkeys(sentiment_columns, True)
+        },
+        color_continuous_scale=px.colors.sequential.Plasma,
+        title="<b>Interactive Sentiment Analysis by Country</b>",
+        height=600,
+        template='plotly_dark'
+    )
+
+    # Map configuration
+    fig.update_layout(
+        geo=dict(
+            showframe=False,
+            showcoastlines=True,
+            projection_type='natural earth',
+            landcolor='lightgray',
+            lakecolor='rgba(0,0,100,0.2)'
+        ),
+        margin={"r":0,"t":40,"l":0,"b":0},
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12,
+            font_family="Arial"
+        ),
+        coloraxis_colorbar=dict(
+            title="Post Count",
+            thickness=20,
+            len=0.75
+        )
+    )
+    return fig
 
-df = load_data()
+df, df_by_date = load_data()
+aggregates = compute_aggregates(df)
 
 # Get unique platforms
-unique_platforms = sorted(df["Platform"].unique()) 
-
-# Find the most liked post for each platform
-most_liked_by_platform = df.loc[df.groupby("Platform")["Likes"].idxmax()]
-
-# Sidebar - Radio selection for platforms
-st.sidebar.subheader("Most Liked Post by Platform")
-selected_platform_radio = st.sidebar.radio(
-    "Select Platform to View Top Post",
-    options=unique_platforms,
-    key="platform_radio"
-)
-
-# Display the most liked post for the selected platform
-platform_post = most_liked_by_platform[most_liked_by_platform["Platform"] == selected_platform_radio]
-if not platform_post.empty:
-    post = platform_post.iloc[0]
-    st.sidebar.success(
-        f"**{selected_platform_radio}** (Most Liked Post):\n\n"
-        f"**👍 Likes:** {post['Likes']}\n\n"
-        f"**📝 Post:** {post['Text']}\n\n"
-        f"**👤 User:** {post['User']}"
+unique_platforms = aggregates["platforms"]
+
+# Most liked post for each platform, keyed by platform
+top_by_platform = aggregates["top_by_platform"]
+
+# Sidebar - Radio selection for platforms, rerun on its own when the radio changes
+@st.fragment
+def most_liked_post():
+    st.subheader("Most Liked Post by Platform")
+    selected_platform_radio = st.radio(
+        "Select Platform to View Top Post",
+        options=unique_platforms,
+        key="platform_radio"
     )
-else:
-    st.sidebar.warning(f"No posts found for {selected_platform_radio}.")
 
-# Country filter
-selected_country = st.sidebar.selectbox("Filter by Country", df["Country"].dropna().unique())
-filtered_df = df[df["Country"] == selected_country]
+    # Display the most liked post for the selected platform
+    post = top_by_platform.get(selected_platform_radio)
+    if post is not None:
+        st.success(
+            f"**{selected_platform_radio}** (Most Liked Post):\n\n"
+            f"**👍 Likes:** {post['Likes']}\n\n"
+            f"**📝 Post:** {post['Text']}\n\n"
+            f"**👤 User:** {post['User']}"
+        )
+    else:
+        st.warning(f"No posts found for {selected_platform_radio}.")
+
+with st.sidebar:
+    most_liked_post()
 
-# Date filters
-selected_year = st.sidebar.slider("Select Year", int(df["Year"].min()), int(df["Year"].max()), int(df["Year"].max()))
-selected_month = st.sidebar.selectbox("Select Month", df["Month"].unique())
-selected_day = st.sidebar.slider("Select Day", 1, 31, 1)
+# Sidebar filters, scoped to their own fragment
+@st.fragment
+def sidebar_filters():
+    # Country filter
+    selected_country = st.selectbox("Filter by Country", df["Country"].dropna().unique())
 
-filtered_df = df[(df["Year"] == selected_year) & (df["Month"] == selected_month) & (df["Day"] == selected_day)]
+    # Date filters
+    selected_year = st.slider("Select Year", int(df["Year"].min()), int(df["Year"].max()), int(df["Year"].max()))
+    selected_month = st.selectbox("Select Month", df["Month"].unique())
+    selected_day = st.slider("Select Day", 1, 31, 1)
+
+    try:
+        # List-of-keys lookup so a single matching row still comes back as a frame
+        filtered_df = df_by_date.loc[[(selected_year, selected_month, selected_day)]]
+    except KeyError:
+        filtered_df = df_by_date.iloc[0:0]
+
+with st.sidebar:
+    sidebar_filters()
 
 # Sentiment analysis
 st.header("Sentiment Analysis")
 
 # Top 10 sentiments
-top_10_sentiments = df["Sentiment"].value_counts().nlargest(10).index
-sentiment_filtered_df = df[df["Sentiment"].isin(top_10_sentiments)]
+top_10_sentiments = aggregates["top_10_sentiments"]
 
 # Sentiment distribution plot (Top 10)
 st.subheader("Sentiment Distribution (Top 10)")
-fig1 = px.bar(
-    sentiment_filtered_df,
-    x="Sentiment",
-    title="Sentiment Distribution (Top 10)",
-    category_orders={"Sentiment": top_10_sentiments},
-    color_discrete_sequence=px.colors.sequential.Viridis
-)
-fig1.update_layout(xaxis_title="Sentiment", yaxis_title="Count")
+fig1 = build_sentiment_bar(aggregates["sentiment_counts"], top_10_sentiments)
 st.plotly_chart(fig1)
 
 # Posts by platform
 st.subheader("Posts by Platform")
-fig2 = px.bar(
-    df,
-    x="Platform",
-    title="Posts by Platform",
-    color_discrete_sequence=px.colors.qualitative.Pastel
-)
-fig2.update_layout(xaxis_title="Platform", yaxis_title="Count")
+fig2 = build_platform_bar(aggregates["platform_counts"])
 st.plotly_chart(fig2)
 
 # Average likes per platform
 st.subheader("Average Likes per Platform")
-platform_likes = df.groupby("Platform", as_index=False)["Likes"].mean()
-fig3 = px.bar(
-    platform_likes,
-    x="Platform",
-    y="Likes",
-    title="Average Likes per Platform",
-    color_discrete_sequence=px.colors.qualitative.Set3
-)
-fig3.update_layout(yaxis_title="Average Likes")
+platform_likes = aggregates["platform_likes"]
+fig3 = build_platform_likes_bar(platform_likes)
 st.plotly_chart(fig3)
 
 # Average likes per sentiment
 st.subheader("Average Likes per Sentiment (Top 10)")
-sentiment_likes = sentiment_filtered_df.groupby("Sentiment", as_index=False)["Likes"].mean()
-fig4 = px.bar(
-    sentiment_likes,
-    x="Sentiment",
-    y="Likes",
-    title="Average Likes per Sentiment (Top 10)",
-    category_orders={"Sentiment": top_10_sentiments},
-    color_discrete_sequence=px.colors.sequential.Plasma
-)
-fig4.update_layout(yaxis_title="Average Likes")
+sentiment_likes = aggregates["sentiment_likes"]
+fig4 = build_sentiment_likes_bar(sentiment_likes, top_10_sentiments)
 st.plotly_chart(fig4)
 
 # Sentiment-platform summary table
 st.subheader("Sentiment Distribution by Platform")
-sentiment_platform_counts = df.pivot_table(index="Platform", columns="Sentiment", aggfunc="size", fill_value=0)
+sentiment_platform_counts = aggregates["sentiment_platform_counts"]
 st.dataframe(sentiment_platform_counts)
 
 # ========== ENHANCED INTERACTIVE MAP ==========
 st.header("🌍 Sentiment by Country")
 
-# Create aggregated data
-country_sentiment = df.groupby(['Country', 'Sentiment']).size().unstack(fill_value=0)
-country_sentiment['Total_Posts'] = country_sentiment.sum(axis=1)
-country_sentiment['Dominant_Sentiment'] = country_sentiment.idxmax(axis=1)
-country_sentiment = country_sentiment.reset_index()
+# Aggregated data
+country_sentiment = aggregates["country_sentiment"]
+country_sentiment_long = aggregates["country_sentiment_long"]
 
 # Create interactive choropleth map
-fig_map = px.choropleth(
-    country_sentiment,
-    locations="Country",
-    locationmode='country names',
-    color="Total_Posts",
-    hover_name="Country",
-    hover_data={
-        'Total_Posts': True,
-        'Dominant_Sentiment': True,
-        **{sentiment: True for sentiment in country_sentiment.columns[1:-2]}
-    },
-    color_continuous_scale=px.colors.sequential.Plasma,
-    title="<b>Interactive Sentiment Analysis by Country</b>",
-    height=600,
-    template='plotly_dark'
-)
-
-# Map configuration
-fig_map.update_layout(
-    geo=dict(
-        showframe=False,
-        showcoastlines=True,
-        projection_type='natural earth',
-        landcolor='lightgray',
-        lakecolor='rgba(0,0,100,0.2)'
-    ),
-    margin={"r":0,"t":40,"l":0,"b":0},
-    hoverlabel=dict(
-        bgcolor="white",
-        font_size=12,
-        font_family="Arial"
-    ),
-    coloraxis_colorbar=dict(
-        title="Post Count",
-        thickness=20,
-        len=0.75
-    )
-)
-
-# Country selection dropdown
-country_list = sorted(country_sentiment['Country'].unique())
-selected_map_country = st.selectbox(
-    "Search or select country to zoom:",
-    country_list,
-    index=country_list.index('United States') if 'United States' in country_list else 0
-)
-
-# Add drill-down tabs
-tab1, tab2 = st.tabs(["📊 Sentiment Breakdown", "🆚 Country Comparison"])
-
-with tab1:
-    # Sentiment breakdown for selected country
-    country_data = country_sentiment[country_sentiment['Country'] == selected_map_country]
-    if not country_data.empty:
-        melted_data = country_data.melt(
-            id_vars=['Country'],
-            value_vars=country_sentiment.columns[1:-2],
-            var_name='Sentiment',
-            value_name='Count'
-        )
-        
-        fig_country = px.bar(
-            melted_data,
-            x='Sentiment',
-            y='Count',
-            color='Sentiment',
-            title=f"Detailed Sentiment Distribution in {selected_map_country}",
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            text_auto=True
-        )
-        fig_country.update_layout(showlegend=False)
-        st.plotly_chart(fig_country, use_container_width=True)
-    else:
-        st.warning("No data available for selected country")
-
-with tab2:
-    # Compare multiple countries
-    compare_countries = st.multiselect(
-        "Select up to 5 countries to compare:",
+fig_map = build_country_map(country_sentiment, aggregates["sentiment_columns"])
+
+# Country drill-down: selecting or comparing countries only reruns this block
+@st.fragment
+def country_drilldown():
+    # Country selection dropdown
+    country_list = aggregates["countries"]
+    selected_map_country = st.selectbox(
+        "Search or select country to zoom:",
         country_list,
-        default=['United States', 'United Kingdom'] if {'United States', 'United Kingdom'}.issubset(country_list) else country_list[:2],
-        max_selections=5
+        index=country_list.index('United States') if 'United States' in country_list else 0
     )
-    
-    if compare_countries:
-        compare_data = country_sentiment[country_sentiment['Country'].isin(compare_countries)]
-        # Melt the data properly for comparison
-        melted_compare = compare_data.melt(
-            id_vars=['Country'], 
-            value_vars=compare_data.columns[1:-2],  # Exclude Total_Posts and Dominant_Sentiment
-            var_name='Sentiment', 
-            value_name='Count'
-        )
-        
-        fig_compare = px.bar(
-            melted_compare,
-            x='Country',
-            y='Count',
-            color='Sentiment',  # Now this matches the melted column name
-            barmode='group',
-            title="Sentiment Comparison Between Countries",
-            labels={'Count': 'Post Count'},
-            color_discrete_sequence=px.colors.qualitative.Pastel
+
+    # Add drill-down tabs
+    tab1, tab2 = st.tabs(["📊 Sentiment Breakdown", "🆚 Country Comparison"])
+
+    with tab1:
+        # Sentiment breakdown for selected country
+        melted_data = country_sentiment_long[country_sentiment_long['Country'] == selected_map_country]
+        if not melted_data.empty:
+            pastel = px.colors.qualitative.Pastel
+            fig_country = go.Figure(go.Bar(
+                x=melted_data['Sentiment'],
+                y=melted_data['Count'],
+                text=melted_data['Count'],
+                texttemplate="%{text}",
+                marker_color=[pastel[i % len(pastel)] for i in range(len(melted_data))]
+            ))
+            fig_country.update_layout(
+                title=f"Detailed Sentiment Distribution in {selected_map_country}",
+                xaxis_title="Sentiment",
+                yaxis_title="Count",
+                showlegend=False
+            )
+            st.plotly_chart(fig_country, use_container_width=True)
+        else:
+            st.warning("No data available for selected country")
+
+    with tab2:
+        # Compare multiple countries
+        compare_countries = st.multiselect(
+            "Select up to 5 countries to compare:",
+            country_list,
+            default=['United States', 'United Kingdom'] if {'United States', 'United Kingdom'}.issubset(country_list) else country_list[:2],
+            max_selections=5
         )
-        st.plotly_chart(fig_compare, use_container_width=True)
-    else:
-        st.info("Please select countries to compare")
+
+        if compare_countries:
+            melted_compare = country_sentiment_long[country_sentiment_long['Country'].isin(compare_countries)]
+
+            fig_compare = px.bar(
+                melted_compare,
+                x='Country',
+                y='Count',
+                color='Sentiment',  # Now this matches the melted column name
+                barmode='group',
+                title="Sentiment Comparison Between Countries",
+                labels={'Count': 'Post Count'},
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            st.plotly_chart(fig_compare, use_container_width=True)
+        else:
+            st.info("Please select countries to compare")
+
+country_drilldown()
 
 # Display the enhanced map
 st.plotly_chart(fig_map, use_container_width=True)
@@ -242,26 +391,5 @@ st.plotly_chart(fig_map, use_container_width=True)
 # ========== WORD CLOUD VISUALIZATION ==========
 st.header("☁️ Most Frequent Words in Posts")
 
-# Preprocess text data for word cloud
-def preprocess_text(text):
-    text = str(text).lower()
-    text = ' '.join([word for word in text.split() if len(word) > 3])
-    return text
-
-# Combine all text
-all_text = ' '.join(df['Text'].apply(preprocess_text))
-
-# Generate word cloud
-wordcloud = WordCloud(
-    width=1200, 
-    height=600,
-    background_color='white',
-    colormap='plasma',
-    max_words=300,
-    stopwords=None,
-    contour_width=0,
-    contour_color='white'
-).generate(all_text)
-
 # Display in Streamlit
-st.image(wordcloud.to_array(), use_column_width=True)
\ No newline at end of file
+st.image(build_wordcloud(df), use_column_width=True)
\ No newline at end of file